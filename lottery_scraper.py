@@ -1,11 +1,28 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 import os
 from dotenv import load_dotenv
 from google.cloud import storage
 
+# Try to import orjson for fast JSON parse/serialize, fallback to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Prefer lxml's C parser for BeautifulSoup, fallback to the stdlib parser
+try:
+    import lxml  # noqa: F401
+    BS_PARSER = 'lxml'
+except ImportError:
+    BS_PARSER = 'html.parser'
+
 # Load environment variables
 load_dotenv()
 
@@ -16,6 +33,46 @@ os.makedirs(DATA_DIR, exist_ok=True)
 # GCS bucket name from environment variable or use default
 LOTTERY_DATA_SCRAPER_BUCKET = os.getenv('LOTTERY_DATA_SCRAPER_BUCKET', '')
 
+# Shared HTTP session: reuses pooled TCP/TLS connections across the per-year
+# page fetches instead of paying a fresh handshake per request, and retries
+# transient failures with backoff. Pool sizes match the scrape thread pool.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                       max_retries=Retry(total=3, backoff_factor=0.5))
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+def read_json_file(path):
+    """Parse a JSON file, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def write_json_file(obj, path):
+    """Write an object as indented JSON, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+# Lazily created GCS handles, shared across calls: storage.Client() does
+# credential discovery and builds an HTTP session, which is too expensive to
+# repeat for every download/upload in the same process
+_gcs_client = None
+_gcs_bucket = None
+
+def _get_bucket():
+    """Return the cached GCS bucket handle, creating the client on first use"""
+    global _gcs_client, _gcs_bucket
+    if _gcs_bucket is None:
+        _gcs_client = storage.Client()
+        _gcs_bucket = _gcs_client.bucket(LOTTERY_DATA_SCRAPER_BUCKET)
+    return _gcs_bucket
+
 def download_from_gcs():
     """
     Download JSON files from Google Cloud Storage using application default credentials.
@@ -24,30 +81,32 @@ def download_from_gcs():
     try:
         print(f"Attempting to download files from GCS bucket: {LOTTERY_DATA_SCRAPER_BUCKET}")
         
-        # Initialize storage client with default credentials
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(LOTTERY_DATA_SCRAPER_BUCKET)
-        
+        # Reuse the cached storage client and bucket handle
+        bucket = _get_bucket()
+
         # Files to download
         files = ['mm.json', 'pb.json']
-        
-        for filename in files:
+
+        def download_one(filename):
             local_path = os.path.join(DATA_DIR, filename)
             blob = bucket.blob(f"data/{filename}")
-            
+
             # Check if blob exists
             if blob.exists():
-                print(f"Downloading {filename} from GCS...")
                 blob.download_to_filename(local_path)
-                print(f"Downloaded {filename} to {local_path}")
-            else:
-                print(f"File {filename} not found in GCS bucket. Using local file if it exists.")
-                # Create empty file if it doesn't exist locally
-                if not os.path.exists(local_path):
-                    with open(local_path, 'w') as f:
-                        json.dump([], f)
-                    print(f"Created empty {local_path}")
-        
+                return f"Downloaded {filename} to {local_path}"
+            # Create empty file if it doesn't exist locally
+            if not os.path.exists(local_path):
+                write_json_file([], local_path)
+                return f"File {filename} not found in GCS bucket. Created empty {local_path}"
+            return f"File {filename} not found in GCS bucket. Using local file if it exists."
+
+        # The per-file transfers are independent GCS round trips — run them
+        # concurrently and report from the main thread to keep output ordered
+        with ThreadPoolExecutor(max_workers=len(files)) as executor:
+            for message in executor.map(download_one, files):
+                print(message)
+
         return True
         
     except Exception as e:
@@ -56,8 +115,7 @@ def download_from_gcs():
         for filename in ['mm.json', 'pb.json']:
             local_path = os.path.join(DATA_DIR, filename)
             if not os.path.exists(local_path):
-                with open(local_path, 'w') as f:
-                    json.dump([], f)
+                write_json_file([], local_path)
                 print(f"Created empty {local_path} (GCS unavailable)")
         return False
 
@@ -69,25 +127,29 @@ def upload_to_gcs():
     try:
         print(f"Attempting to upload files to GCS bucket: {LOTTERY_DATA_SCRAPER_BUCKET}")
         
-        # Initialize storage client with default credentials
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(LOTTERY_DATA_SCRAPER_BUCKET)
-        
+        # Reuse the cached storage client and bucket handle
+        bucket = _get_bucket()
+
         # Files to upload
         files = ['mm.json', 'pb.json', 'mm-stats.json', 'pb-stats.json']
-        
-        for filename in files:
+
+        def upload_one(filename):
             local_path = os.path.join(DATA_DIR, filename)
-            
+
             # Skip if file doesn't exist
             if not os.path.exists(local_path):
-                print(f"Warning: {local_path} not found. Skipping upload.")
-                continue
-            
+                return f"Warning: {local_path} not found. Skipping upload."
+
             blob = bucket.blob(f"data/{filename}")
             blob.upload_from_filename(local_path)
-            print(f"Uploaded {local_path} to GCS as data/{filename}")
-        
+            return f"Uploaded {local_path} to GCS as data/{filename}"
+
+        # The per-file transfers are independent GCS round trips — run them
+        # concurrently and report from the main thread to keep output ordered
+        with ThreadPoolExecutor(max_workers=len(files)) as executor:
+            for message in executor.map(upload_one, files):
+                print(message)
+
         print("Successfully uploaded all files to GCS")
         return True
         
@@ -105,27 +167,29 @@ def get_latest_draws():
         powerball_date = None
         megamillions_date = None
         
-        # Try to load Powerball draws
+        # Try to load Powerball draws (EAFP: one open instead of stat + open)
         pb_path = os.path.join(DATA_DIR, 'pb.json')
-        if os.path.exists(pb_path):
-            with open(pb_path, 'r') as f:
-                powerball_draws = json.load(f)
-                if powerball_draws and len(powerball_draws) > 0:
-                    # Sort by date in descending order to get the latest
-                    powerball_draws.sort(key=lambda x: x.get('date', ''), reverse=True)
-                    powerball_date = powerball_draws[0].get('date')
-                    print(f"Latest Powerball draw: {powerball_draws[0]}")
-        
-        # Try to load Mega Millions draws
+        try:
+            powerball_draws = read_json_file(pb_path)
+        except FileNotFoundError:
+            powerball_draws = []
+        if powerball_draws and len(powerball_draws) > 0:
+            # One O(N) max beats sorting the whole history to read element 0
+            latest_pb = max(powerball_draws, key=lambda x: x.get('date', ''))
+            powerball_date = latest_pb.get('date')
+            print(f"Latest Powerball draw: {latest_pb}")
+        
+        # Try to load Mega Millions draws (EAFP: one open instead of stat + open)
         mm_path = os.path.join(DATA_DIR, 'mm.json')
-        if os.path.exists(mm_path):
-            with open(mm_path, 'r') as f:
-                megamillions_draws = json.load(f)
-                if megamillions_draws and len(megamillions_draws) > 0:
-                    # Sort by date in descending order to get the latest
-                    megamillions_draws.sort(key=lambda x: x.get('date', ''), reverse=True)
-                    megamillions_date = megamillions_draws[0].get('date')
-                    print(f"Latest Mega Millions draw: {megamillions_draws[0]}")
+        try:
+            megamillions_draws = read_json_file(mm_path)
+        except FileNotFoundError:
+            megamillions_draws = []
+        if megamillions_draws and len(megamillions_draws) > 0:
+            # One O(N) max beats sorting the whole history to read element 0
+            latest_mm = max(megamillions_draws, key=lambda x: x.get('date', ''))
+            megamillions_date = latest_mm.get('date')
+            print(f"Latest Mega Millions draw: {latest_mm}")
         
         return {
             'powerball': powerball_date,
@@ -135,25 +199,64 @@ def get_latest_draws():
         print(f"Error fetching latest draws from JSON files: {e}")
         return {'powerball': None, 'mega-millions': None}
 
-def scrape_lottery_numbers(url, game_type):
+HTTP_CACHE_FILE = '_http_cache.json'
+
+def _load_http_cache():
+    """Load the per-URL ETag/Last-Modified cache, empty on any failure"""
+    try:
+        return read_json_file(os.path.join(DATA_DIR, HTTP_CACHE_FILE))
+    except (OSError, ValueError):
+        return {}
+
+def _save_http_cache(cache):
+    """Persist the per-URL ETag/Last-Modified cache, best effort"""
+    try:
+        write_json_file(cache, os.path.join(DATA_DIR, HTTP_CACHE_FILE))
+    except OSError:
+        pass
+
+def scrape_lottery_numbers(url, game_type, http_cache=None):
     """
     Scrape lottery numbers directly from URL
     game_type: 'powerball' or 'megamillions'
+
+    When an http_cache dict is supplied, the request carries the validators
+    (If-None-Match/If-Modified-Since) recorded for the URL and a 304 response
+    returns the previously parsed draws without re-downloading or re-parsing —
+    past years' pages never change, so most revalidations are one cheap RTT.
     """
     try:
-        # Get webpage content
-        response = requests.get(url)
+        # Send cached validators so an unchanged page can answer with a 304
+        cached = http_cache.get(url) if http_cache is not None else None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        # Get webpage content (shared session keeps the connection alive)
+        response = _SESSION.get(url, timeout=(5, 30), headers=headers or None)
+        if cached and response.status_code == 304:
+            return cached.get('draws', [])
         response.raise_for_status()
         
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Parse the HTML content (raw bytes skip the .text decode pass;
+        # lxml parses several times faster than the stdlib parser)
+        soup = BeautifulSoup(response.content, BS_PARSER)
         
         # Find all draw entries (they are in table rows)
         draws = []
         
         # Find all table rows that contain draw information
         draw_rows = soup.find_all('tr')
-        
+
+        # Selector strings depend only on game_type — build them once
+        # instead of re-allocating per row
+        draw_type = 'powerball' if game_type == 'powerball' else 'mega-millions'
+        numbers_list_class = f'multi results {draw_type}'
+        special_ball_class = 'powerball' if game_type == 'powerball' else 'mega-ball'
+
         for row in draw_rows:
             try:
                 # Find the date cell
@@ -176,14 +279,14 @@ def scrape_lottery_numbers(url, game_type):
                 date_str = f"{date_parts[1]} {date_parts[2].replace(',', '')}, {date_parts[3]}"
                 date = datetime.strptime(date_str, '%B %d, %Y').strftime('%Y-%m-%d')
                 
-                # Find the numbers cell
-                numbers_cell = row.find_all('td')[1] if len(row.find_all('td')) > 1 else None
+                # Find the numbers cell (walk the row's cells once)
+                cells = row.find_all('td')
+                numbers_cell = cells[1] if len(cells) > 1 else None
                 if not numbers_cell:
                     continue
                 
                 # Find the first set of numbers (main draw, not double play)
-                game_class = 'powerball' if game_type == 'powerball' else 'mega-millions'
-                numbers_list = numbers_cell.find('ul', class_=f'multi results {game_class}')
+                numbers_list = numbers_cell.find('ul', class_=numbers_list_class)
                 if not numbers_list:
                     continue
                 
@@ -195,7 +298,7 @@ def scrape_lottery_numbers(url, game_type):
                 main_numbers = [int(num.text.strip()) for num in numbers[:5]]
                 
                 # Extract special ball number (Powerball or Mega Ball)
-                special_ball = numbers_list.find('li', class_='powerball' if game_type == 'powerball' else 'mega-ball')
+                special_ball = numbers_list.find('li', class_=special_ball_class)
                 if not special_ball:
                     continue
                     
@@ -205,34 +308,65 @@ def scrape_lottery_numbers(url, game_type):
                     'date': date,
                     'numbers': main_numbers,
                     'specialBall': special_ball_number,
-                    'type': 'powerball' if game_type == 'powerball' else 'mega-millions'
+                    'type': draw_type
                 })
             except Exception as e:
                 print(f"Error processing draw entry: {e}")
                 continue
         
+        # Record the page validators and parsed draws for the next run
+        if http_cache is not None:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                http_cache[url] = {'etag': etag, 'last_modified': last_modified,
+                                   'draws': draws}
+
         return draws
-        
+
     except Exception as e:
         print(f"Error scraping {game_type} data: {e}")
         return None
 
+def scrape_lottery_years(base_url, game_type, start_year, end_year, max_workers=8,
+                         http_cache=None):
+    """
+    Scrape every year's results page from start_year through end_year
+
+    The per-year pages are independent HTTP fetches dominated by network
+    round trips, so they run on a thread pool and their waits overlap;
+    results come back in year order regardless of completion order.
+
+    Returns:
+        list: All draws scraped across the years, in year order
+    """
+    years = range(start_year, end_year + 1)
+    print(f"Scraping years {start_year}-{end_year} on up to {max_workers} threads...")
+    all_draws = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda year: scrape_lottery_numbers(f"{base_url}/{year}", game_type,
+                                                http_cache),
+            years)
+        for year_draws in results:
+            if year_draws:
+                all_draws.extend(year_draws)
+    return all_draws
+
 def filter_lottery_data(data, start_date):
     """Filter lottery data from the day after start_date"""
     try:
         if not start_date:
             # If no start_date provided, return all data
             return data
-            
-        # Convert start_date string to datetime object
-        start_datetime = datetime.strptime(start_date, '%Y-%m-%d')
-        
+
+        # Validate the start date once; ISO dates compare correctly as plain
+        # strings, so the per-draw strptime calls are unnecessary
+        datetime.strptime(start_date, '%Y-%m-%d')
+
         # Filter draws from the day after start_date (exclusive)
-        filtered_data = [
-            draw for draw in data 
-            if datetime.strptime(draw['date'], '%Y-%m-%d') > start_datetime
-        ]
-        
+        filtered_data = [draw for draw in data if draw['date'] > start_date]
+
         # Sort the filtered data by date in descending order (newest first)
         filtered_data.sort(key=lambda x: x['date'], reverse=True)
         
@@ -268,11 +402,13 @@ def save_to_json(draws, filename):
         # Track if new draws were added
         new_draws_added = False
         
-        # Load existing draws if file exists
-        existing_draws = []
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                existing_draws = json.load(f)
+        # Load existing draws if file exists (EAFP: one open, no stat first)
+        try:
+            existing_draws = read_json_file(file_path)
+            file_exists = True
+        except FileNotFoundError:
+            existing_draws = []
+            file_exists = False
         
         # Add new draws to existing draws
         # Create a set of existing dates to avoid duplicates
@@ -284,13 +420,18 @@ def save_to_json(draws, filename):
                 existing_dates.add(draw.get('date'))
                 new_draws_added = True
         
+        # Skip the sort and full-file rewrite when nothing changed — the
+        # common case for scheduled runs is zero new draws, and rewriting
+        # the whole history then is pure O(N) I/O for no effect
+        if not new_draws_added and file_exists:
+            return False
+
         # Sort draws by date (newest first)
         existing_draws.sort(key=lambda x: x.get('date', ''), reverse=True)
-        
+
         # Save to file
-        with open(file_path, 'w') as f:
-            json.dump(existing_draws, f, indent=2)
-        
+        write_json_file(existing_draws, file_path)
+
         return new_draws_added
     except Exception as e:
         print(f"Error saving to JSON: {e}")
@@ -352,13 +493,13 @@ def scrape_lottery_data():
         print("\nProcessing Powerball draws...")
         print(f"Latest Powerball draw date: {latest_draws['powerball']}")
         
-        all_powerball_draws = []
-        for year in range(pb_start_year, current_year + 1):
-            powerball_url = f"https://www.lottery.net/powerball/numbers/{year}"
-            print(f"Scraping Powerball from {year}...")
-            year_draws = scrape_lottery_numbers(powerball_url, 'powerball')
-            if year_draws:
-                all_powerball_draws.extend(year_draws)
+        # Conditional-request cache: past years' pages are immutable, so
+        # revalidating them usually costs one 304 round trip with no parse
+        http_cache = _load_http_cache()
+
+        all_powerball_draws = scrape_lottery_years(
+            "https://www.lottery.net/powerball/numbers", 'powerball',
+            pb_start_year, current_year, http_cache=http_cache)
         
         filtered_powerball = []
         if all_powerball_draws:
@@ -377,13 +518,12 @@ def scrape_lottery_data():
         print("\nProcessing Mega Millions draws...")
         print(f"Latest Mega Millions draw date: {latest_draws['mega-millions']}")
         
-        all_megamillions_draws = []
-        for year in range(mm_start_year, current_year + 1):
-            megamillions_url = f"https://www.lottery.net/mega-millions/numbers/{year}"
-            print(f"Scraping Mega Millions from {year}...")
-            year_draws = scrape_lottery_numbers(megamillions_url, 'megamillions')
-            if year_draws:
-                all_megamillions_draws.extend(year_draws)
+        all_megamillions_draws = scrape_lottery_years(
+            "https://www.lottery.net/mega-millions/numbers", 'megamillions',
+            mm_start_year, current_year, http_cache=http_cache)
+
+        # Persist the validators and parsed draws gathered this run
+        _save_http_cache(http_cache)
         
         filtered_megamillions = []
         if all_megamillions_draws:
@@ -399,8 +539,9 @@ def scrape_lottery_data():
                     print("No new Mega Millions draws to save")
         
         # Automatically update statistics if new draws were added
+        stats_updated = False
         if any_new_draws:
-            update_statistics()
+            stats_updated = update_statistics()
         
         # Try to upload updated files to GCS (non-blocking - files already saved locally)
         try:
@@ -411,7 +552,9 @@ def scrape_lottery_data():
         print(f"\nAll data saved locally to {DATA_DIR}/ directory")
         return {
             'powerball': filtered_powerball,
-            'megamillions': filtered_megamillions
+            'megamillions': filtered_megamillions,
+            'new_draws': any_new_draws,
+            'stats_updated': stats_updated
         }
         
     except Exception as e:
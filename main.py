@@ -46,32 +46,29 @@ def run_scraper():
     
     # Scrape new lottery data (always saves locally, regardless of GCS)
     print("Scraping new lottery data...")
-    scrape_lottery_data()
-    
-    # Calculate and save statistics (always recalculates, even if no new draws found)
-    print("\nRecalculating statistics from existing data...")
-    try:
-        mm_stats, pb_stats = calculate_lottery_stats()
-        
-        # Save stats to local files (always happens, regardless of GCS)
-        os.makedirs("data", exist_ok=True)
-        with open("data/mm-stats.json", "w") as f:
-            json.dump(mm_stats, f, indent=2)
-        print("Saved mm-stats.json locally")
-        
-        with open("data/pb-stats.json", "w") as f:
-            json.dump(pb_stats, f, indent=2)
-        print("Saved pb-stats.json locally")
-    except Exception as e:
-        print(f"Error calculating statistics: {e}")
-        print("Note: Data files may still have been updated. Check data/ directory.")
-    
-    # Try to upload all files to GCS (non-blocking - files already saved locally)
-    print("\nAttempting to upload files to GCS bucket:", BUCKET_NAME)
-    try:
-        upload_to_gcs()
-    except Exception as e:
-        print(f"Note: GCS upload failed ({e}). All files saved locally in data/ directory.")
+    scrape_result = scrape_lottery_data()
+
+    # The scraper already recalculates statistics and uploads to GCS when it
+    # finds new draws — rerunning both here would double the most expensive
+    # steps. Only fill the gap when the scraper didn't update stats itself.
+    if scrape_result and scrape_result.get('stats_updated'):
+        print("\nStatistics already updated during scraping. Skipping recalculation.")
+    else:
+        # Calculate and save statistics (calculate_lottery_stats writes the
+        # stats files itself)
+        print("\nRecalculating statistics from existing data...")
+        try:
+            calculate_lottery_stats()
+        except Exception as e:
+            print(f"Error calculating statistics: {e}")
+            print("Note: Data files may still have been updated. Check data/ directory.")
+
+        # Try to upload all files to GCS (non-blocking - files already saved locally)
+        print("\nAttempting to upload files to GCS bucket:", BUCKET_NAME)
+        try:
+            upload_to_gcs()
+        except Exception as e:
+            print(f"Note: GCS upload failed ({e}). All files saved locally in data/ directory.")
     
     print("\n✓ Scrape and stats update completed successfully")
     print(f"✓ All data saved locally in data/ directory")